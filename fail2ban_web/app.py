@@ -9,21 +9,65 @@ Provides REST API + WebSocket for real-time ban events.
 """
 
 import asyncio
+import hashlib
 import json
 import os
+import random
 import re
-import subprocess
+import shlex
+import socket
+import stat
 import sys
 import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Optional
 
-from fastapi import FastAPI, HTTPException, Query, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 
-app = FastAPI(title="fail2ban Web Dashboard", version="1.0.0")
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import pyinotify
+except ImportError:  # pragma: no cover - falls back to polling the log
+    pyinotify = None
+
+try:
+    # Linear-time matching for the log tail, immune to regex backtracking
+    import re2 as tail_re
+except ImportError:  # pragma: no cover
+    tail_re = re
+
+if orjson is not None:
+    _dumps = orjson.dumps
+else:  # pragma: no cover
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), default=datetime.isoformat).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson when it is installed.
+
+    Datetimes are emitted as RFC 3339 strings by the encoder itself.
+    """
+
+    def render(self, content) -> bytes:
+        return _dumps(content)
+
+
+app = FastAPI(
+    title="fail2ban Web Dashboard", version="1.0.0", default_response_class=FastJSONResponse
+)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 static_dir = Path(__file__).parent / "static"
 if static_dir.exists():
@@ -35,25 +79,103 @@ F2B_USE_SUDO = os.environ.get("F2B_USE_SUDO", "true").lower() == "true"
 F2B_SSH_HOST = os.environ.get("F2B_SSH_HOST", "")  # If set, connect via SSH
 F2B_SSH_USER = os.environ.get("F2B_SSH_USER", "root")
 F2B_SSH_KEY = os.environ.get("F2B_SSH_KEY", "")
+F2B_SOCKET = os.environ.get("F2B_SOCKET", "")  # If set, talk to the server socket directly
+F2B_LOG_PATH = os.environ.get("F2B_LOG_PATH", "/var/log/fail2ban.log")  # Empty disables log tailing
 DB_PATH = os.environ.get("F2B_DB_PATH", str(Path(__file__).parent / "f2b_dashboard.db"))
 
 # Demo mode — if fail2ban-client is not available, serve demo data
 DEMO_MODE = os.environ.get("F2B_DEMO", "auto")  # "auto", "true", "false"
 
+# Only the socket transport needs the fail2ban package (which also installs
+# its logging extensions on import), so other modes run without it.
+if F2B_SOCKET:
+    from fail2ban.client.csocket import CSocket
+
+
+# Blocking work (SQLite, the fail2ban socket) runs in this pool so a slow call
+# never stalls the event loop.
+_io_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="f2b-io")
+
+
+async def _run_blocking(fn, *args):
+    """Run fn(*args) in the I/O thread pool and await its result."""
+    return await asyncio.get_running_loop().run_in_executor(_io_pool, fn, *args)
+
+
+# Shared SQLite connection, opened once by init_db(). It runs in autocommit
+# mode (isolation_level=None) so every INSERT is a single WAL append; access
+# is serialized through _db_lock since SQLite allows only one writer anyway.
+_conn: Optional[sqlite3.Connection] = None
+_db_lock = threading.Lock()
+
+
+# Schema version stored in PRAGMA user_version; _upgrade_db() brings older
+# databases up to date.
+DB_VERSION = 1
+
+_BAN_LOG_TABLE = """
+    CREATE TABLE IF NOT EXISTS ban_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp INTEGER NOT NULL,  -- Unix epoch, milliseconds
+        jail TEXT NOT NULL,
+        ip TEXT NOT NULL,
+        action TEXT NOT NULL DEFAULT 'ban',
+        country TEXT,
+        hostname TEXT
+    );
+"""
+
+
+def _upgrade_db(conn: sqlite3.Connection, version: int):
+    if version < 1:
+        # ban_log.timestamp: ISO-8601 text -> INTEGER epoch milliseconds.
+        # Text julianday() cannot parse is stored as 0 (the epoch) rather than
+        # NULL, which the NOT NULL column would reject.
+        bad = conn.execute(
+            "SELECT COUNT(*) FROM ban_log WHERE julianday(timestamp) IS NULL"
+        ).fetchone()[0]
+        if bad:
+            print(f"ban_log: {bad} row(s) with an unreadable timestamp migrated as 1970-01-01")
+        try:
+            conn.executescript(f"""
+                BEGIN;
+                ALTER TABLE ban_log RENAME TO ban_log_v0;
+                {_BAN_LOG_TABLE}
+                INSERT INTO ban_log (id, timestamp, jail, ip, action, country, hostname)
+                    SELECT id,
+                           COALESCE(CAST(ROUND((julianday(timestamp) - 2440587.5) * 86400000)
+                                         AS INTEGER), 0),
+                           jail, ip, action, country, hostname
+                    FROM ban_log_v0;
+                DROP TABLE ban_log_v0;
+                COMMIT;
+            """)
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+
+def _ts_to_datetime(ms: int) -> datetime:
+    """Convert an epoch-milliseconds ban_log timestamp to an aware UTC datetime."""
+    return datetime.fromtimestamp(ms / 1000, timezone.utc)
+
 
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
+    global _conn
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
     conn.execute("PRAGMA journal_mode=WAL")
-    conn.executescript("""
-        CREATE TABLE IF NOT EXISTS ban_log (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp TEXT NOT NULL,
-            jail TEXT NOT NULL,
-            ip TEXT NOT NULL,
-            action TEXT NOT NULL DEFAULT 'ban',
-            country TEXT,
-            hostname TEXT
-        );
+    conn.execute("PRAGMA wal_autocheckpoint=1000")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-2000")
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    has_ban_log = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ban_log'"
+    ).fetchone()
+    if has_ban_log and version < DB_VERSION:
+        _upgrade_db(conn, version)
+    conn.executescript(_BAN_LOG_TABLE + """
         CREATE TABLE IF NOT EXISTS snapshots (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp TEXT NOT NULL,
@@ -65,48 +187,290 @@ def init_db():
         CREATE INDEX IF NOT EXISTS idx_ban_log_ts ON ban_log(timestamp);
         CREATE INDEX IF NOT EXISTS idx_ban_log_jail ON ban_log(jail);
         CREATE INDEX IF NOT EXISTS idx_ban_log_ip ON ban_log(ip);
+        CREATE INDEX IF NOT EXISTS idx_ban_log_action_ip ON ban_log(action, ip, timestamp);
     """)
-    conn.commit()
-    conn.close()
+    conn.execute(f"PRAGMA user_version = {DB_VERSION}")
+    _conn = conn
 
 
-def run_f2b_command(args: list[str]) -> tuple[str, int]:
-    """Execute a fail2ban-client command."""
+# Ban log rows are not written on the request path: endpoints enqueue them and
+# a background task coalesces whatever is pending into a single transaction.
+_WRITE_BATCH = 25
+_write_q: Optional[asyncio.Queue] = None
+_writer_task: Optional[asyncio.Task] = None
+
+
+def _insert_ban_log(rows: list[tuple]):
+    """Insert (epoch_ms, jail, ip, action) rows in one transaction."""
+    with _db_lock, _conn:
+        _conn.execute("BEGIN")
+        _conn.executemany(
+            "INSERT INTO ban_log (timestamp, jail, ip, action) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+
+
+async def _writer_loop():
+    """Drain the write queue, committing up to _WRITE_BATCH rows at a time."""
+    while True:
+        rows = [await _write_q.get()]
+        while len(rows) < _WRITE_BATCH:
+            try:
+                rows.append(_write_q.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        try:
+            await _run_blocking(_insert_ban_log, rows)
+        except sqlite3.Error as e:
+            print(f"Failed to write {len(rows)} ban log row(s): {e}")
+        finally:
+            for _ in rows:
+                _write_q.task_done()
+
+
+def _f2b_call_sync(args: list[str]) -> tuple[object, int]:
+    """Send a command to the fail2ban server socket.
+
+    Returns the unformatted server response (the structure fail2ban-client
+    would beautify) together with its return code.
+    """
+    try:
+        sock = CSocket(F2B_SOCKET, timeout=10)
+        try:
+            code, response = sock.send(args)
+        finally:
+            sock.close()
+    except socket.timeout:
+        return "timeout", -2
+    except (OSError, EOFError) as e:
+        return str(e), -1
+    return response, code
+
+
+async def _f2b_call(args: list[str]) -> tuple[object, int]:
+    """Run _f2b_call_sync() off the event loop."""
+    return await _run_blocking(_f2b_call_sync, args)
+
+
+# SSH commands share one multiplexed connection, so only the first pays for
+# the TCP handshake, key exchange and authentication. The options are set at
+# startup, once a private directory for the master socket exists.
+SSH_CONTROL_DIR = Path.home() / ".ssh" / "f2b-dashboard"
+_ssh_mux_opts: list[str] = []
+
+
+def _ssh_control_dir() -> Optional[Path]:
+    """Create the 0700 directory holding the SSH master socket.
+
+    ssh_config(5) requires ControlPath to be in a directory other users
+    cannot write to, or they could plant a master of their own. Returns None
+    if the directory cannot be made private to us.
+    """
+    try:
+        SSH_CONTROL_DIR.parent.mkdir(mode=0o700, exist_ok=True)
+        SSH_CONTROL_DIR.mkdir(mode=0o700, exist_ok=True)
+        st = SSH_CONTROL_DIR.lstat()
+    except OSError as e:
+        print(f"Not multiplexing SSH connections: {e}")
+        return None
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        print(f"Not multiplexing SSH connections: {SSH_CONTROL_DIR} is not private")
+        return None
+    return SSH_CONTROL_DIR
+
+
+def _ssh_command() -> list[str]:
+    """Build the ssh command line prefix for F2B_SSH_HOST."""
+    cmd = ["ssh", *_ssh_mux_opts]
+    if F2B_SSH_KEY:
+        cmd += ["-i", F2B_SSH_KEY]
+    cmd += [f"{F2B_SSH_USER}@{F2B_SSH_HOST}"]
+    return cmd
+
+
+async def _exec(cmd: list[str]) -> tuple[str, int]:
+    """Run a command, returning its stripped stdout and exit code."""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+    except FileNotFoundError:
+        return "", -1
+    try:
+        stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=10)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        return "timeout", -2
+    return stdout.decode(errors="replace").strip(), proc.returncode
+
+
+def _f2b_client_command() -> list[str]:
+    """Build the command line that starts fail2ban-client (without arguments)."""
     cmd = []
     if F2B_SSH_HOST:
-        cmd = ["ssh"]
-        if F2B_SSH_KEY:
-            cmd += ["-i", F2B_SSH_KEY]
-        cmd += [f"{F2B_SSH_USER}@{F2B_SSH_HOST}"]
+        cmd = _ssh_command()
     if F2B_USE_SUDO and not F2B_SSH_HOST:
         cmd.append("sudo")
     cmd.append(F2B_CLIENT)
-    cmd.extend(args)
+    return cmd
 
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-        return result.stdout.strip(), result.returncode
-    except FileNotFoundError:
-        return "", -1
-    except subprocess.TimeoutExpired:
-        return "timeout", -2
 
+class InteractiveClient:
+    """A long-lived `fail2ban-client -i` shell.
+
+    Commands are written to its stdin one at a time and each response is
+    read up to the next prompt, so no process is started per command.
+    Interactive mode has no per-command exit status: stderr is merged into
+    stdout and a response carrying an ERROR log line counts as a failure.
+    A shell that has died is restarted on the next call. A shell runs one
+    command at a time; InteractiveClientPool hands them out.
+    """
+
+    PROMPT = b"fail2ban> "
+    TIMEOUT = 10
+    # Large enough for `status --all` on jails with many banned IPs
+    READ_LIMIT = 16 * 1024 * 1024
+    # Client log lines, bare or prefixed by "<time> fail2ban [<pid>]: "
+    _ERROR_RE = re.compile(r"^(?:.*\]: )?ERROR\b", re.M)
+
+    def __init__(self, cmd: list[str]):
+        self.cmd = cmd + ["-i"]
+        self._proc: Optional[asyncio.subprocess.Process] = None
+
+    async def start(self) -> bool:
+        return await self._spawn()
+
+    async def call(self, args: list[str]) -> Optional[tuple[str, int]]:
+        """Run one command, or return None if the shell cannot be used."""
+        if self._proc is None or self._proc.returncode is not None:
+            if not await self._spawn():
+                return None
+        try:
+            self._proc.stdin.write((shlex.join(args) + "\n").encode())
+            await self._proc.stdin.drain()
+            output = (await self._read_response()).strip()
+        except asyncio.TimeoutError:
+            await self.close()
+            return "timeout", -2
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            await self.close()
+            return None
+        except BaseException:
+            # Cancelled mid-exchange: the unread reply would be taken for the
+            # next command's, so the shell is discarded instead.
+            await self.close()
+            raise
+        return output, 255 if self._ERROR_RE.search(output) else 0
+
+    async def close(self):
+        proc, self._proc = self._proc, None
+        if proc is not None and proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+
+    async def _spawn(self) -> bool:
+        try:
+            self._proc = await asyncio.create_subprocess_exec(
+                *self.cmd,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                limit=self.READ_LIMIT,
+            )
+            await self._read_response()  # banner up to the first prompt
+            return True
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                asyncio.TimeoutError):
+            await self.close()
+            return False
+        except BaseException:
+            await self.close()
+            raise
+
+    async def _read_response(self) -> str:
+        data = await asyncio.wait_for(self._proc.stdout.readuntil(self.PROMPT), self.TIMEOUT)
+        return data[:-len(self.PROMPT)].decode(errors="replace")
+
+
+class InteractiveClientPool:
+    """A few interactive shells shared by all CLI commands.
+
+    Each command borrows an idle shell, so independent commands (the
+    per-jail status queries, a ban issued during a refresh) still run
+    concurrently, and a shell killed by a timeout only fails its own
+    command. Shells beyond the first start on first use.
+    """
+
+    SIZE = 4
 
-def is_f2b_available() -> bool:
+    def __init__(self, cmd: list[str]):
+        self._shells = [InteractiveClient(cmd) for _ in range(self.SIZE)]
+        self._idle: asyncio.Queue = asyncio.Queue()
+        for shell in self._shells:
+            self._idle.put_nowait(shell)
+
+    async def start(self) -> bool:
+        """Start one shell to find out whether interactive mode works."""
+        return await self._shells[0].start()
+
+    async def call(self, args: list[str]) -> Optional[tuple[str, int]]:
+        shell = await self._idle.get()
+        try:
+            return await shell.call(args)
+        finally:
+            self._idle.put_nowait(shell)
+
+    async def close(self):
+        for shell in self._shells:
+            await shell.close()
+
+
+_f2b_shell: Optional[InteractiveClientPool] = None
+
+
+async def run_f2b_command(args: list[str]) -> tuple[str, int]:
+    """Execute a fail2ban-client command."""
+    if F2B_SOCKET:
+        response, code = await _f2b_call(args)
+        return str(response), code
+
+    # Options such as -V are not commands and cannot go through the shell
+    if _f2b_shell is not None and not args[0].startswith("-"):
+        result = await _f2b_shell.call(args)
+        if result is not None:
+            return result
+    return await _exec(_f2b_client_command() + args)
+
+
+async def is_f2b_available() -> bool:
     """Check if fail2ban-client is accessible."""
-    output, code = run_f2b_command(["status"])
+    output, code = await run_f2b_command(["status"])
     return code == 0
 
 
-def get_demo_data():
+DEMO_JAILS = ["sshd", "nginx-http-auth", "postfix", "dovecot", "apache-auth", "recidive"]
+DEMO_COUNTRIES = ["CN", "RU", "US", "BR", "IN", "KR", "DE", "FR", "VN", "ID"]
+# Demo data does not need to change on every poll; it is regenerated at most
+# once per DEMO_TTL seconds.
+DEMO_TTL = 5.0
+_demo_cache = {"t": 0.0, "data": None}
+
+
+def _random_demo_ips(n: int) -> list[str]:
+    """Draw n unicast IPv4 addresses (1.0.0.1 - 223.255.255.254)."""
+    return [
+        socket.inet_ntoa(random.randrange(0x01000001, 0xDFFFFFFF).to_bytes(4, "big"))
+        for _ in range(n)
+    ]
+
+
+def _generate_demo_data() -> dict:
     """Generate realistic demo data for testing the dashboard without fail2ban."""
-    import random
-    jails = ["sshd", "nginx-http-auth", "postfix", "dovecot", "apache-auth", "recidive"]
+    jails = DEMO_JAILS
     demo_jails = {}
     for jail in jails:
-        banned_ips = []
-        for _ in range(random.randint(0, 8)):
-            banned_ips.append(f"{random.randint(1,223)}.{random.randint(0,255)}.{random.randint(0,255)}.{random.randint(1,254)}")
+        banned_ips = _random_demo_ips(random.randint(0, 8))
         demo_jails[jail] = {
             "currently_banned": len(banned_ips),
             "total_banned": len(banned_ips) + random.randint(5, 50),
@@ -118,32 +482,36 @@ def get_demo_data():
             },
         }
 
-    # Generate ban timeline for last 24h
-    timeline = []
+    # Generate ban timeline for last 24h, drawing each jail's hourly counts at once
     now = datetime.now(timezone.utc)
-    for h in range(24):
-        ts = now - timedelta(hours=23 - h)
-        for jail in jails:
-            count = random.randint(0, 15) if jail == "sshd" else random.randint(0, 5)
-            if count > 0:
-                timeline.append({
-                    "hour": ts.strftime("%H:00"),
-                    "jail": jail,
-                    "count": count,
-                })
+    hours = [(now - timedelta(hours=23 - h)).strftime("%H:00") for h in range(24)]
+    counts = {
+        jail: random.choices(range(16) if jail == "sshd" else range(6), k=24)
+        for jail in jails
+    }
+    timeline = [
+        {"hour": hour, "jail": jail, "count": counts[jail][h]}
+        for h, hour in enumerate(hours)
+        for jail in jails
+        if counts[jail][h] > 0
+    ]
 
     # Top banned IPs
-    top_ips = []
-    for _ in range(10):
-        ip = f"{random.randint(1,223)}.{random.randint(0,255)}.{random.randint(0,255)}.{random.randint(1,254)}"
-        countries = ["CN", "RU", "US", "BR", "IN", "KR", "DE", "FR", "VN", "ID"]
-        top_ips.append({
-            "ip": ip,
-            "ban_count": random.randint(3, 25),
-            "country": random.choice(countries),
-            "last_seen": (now - timedelta(minutes=random.randint(1, 1440))).isoformat(),
+    n = 10
+    ips = _random_demo_ips(n)
+    ban_counts = random.choices(range(3, 26), k=n)
+    countries = random.choices(DEMO_COUNTRIES, k=n)
+    minutes_ago = random.choices(range(1, 1441), k=n)
+    top_ips = [
+        {
+            "ip": ips[i],
+            "ban_count": ban_counts[i],
+            "country": countries[i],
+            "last_seen": now - timedelta(minutes=minutes_ago[i]),
             "jails": random.sample(jails, random.randint(1, 3)),
-        })
+        }
+        for i in range(n)
+    ]
     top_ips.sort(key=lambda x: x["ban_count"], reverse=True)
 
     return {
@@ -155,13 +523,66 @@ def get_demo_data():
     }
 
 
-def parse_jail_status(jail_name: str) -> dict:
-    """Parse fail2ban-client status <jail> output."""
-    output, code = run_f2b_command(["status", jail_name])
-    if code != 0:
-        return {"error": f"Failed to get status for {jail_name}"}
+def get_demo_data() -> dict:
+    """Return demo data, regenerated at most every DEMO_TTL seconds."""
+    now = time.monotonic()
+    if _demo_cache["data"] is None or now - _demo_cache["t"] >= DEMO_TTL:
+        _demo_cache["data"] = _generate_demo_data()
+        _demo_cache["t"] = now
+    return _demo_cache["data"]
+
+
+def _parse_status_tree(output: str) -> list:
+    """Rebuild the server response from fail2ban-client's status tree.
+
+    "|- label:\tvalue" lines become (label, value) pairs and "|- label"
+    lines become (label, [children]) nodes, nested by indentation, which is
+    the structure the server socket returns (values stay strings).
+    """
+    root: list = []
+    stack = [root]
+    for line in output.splitlines():
+        pos = line.find("- ")
+        # Header lines such as "Status for the jail: sshd" carry no tree glyph
+        if pos < 0 or line[:pos].strip(" |`"):
+            continue
+        depth = pos // 3
+        label, sep, value = line[pos + 2:].partition(":\t")
+        del stack[depth + 1:]
+        if sep:
+            stack[depth].append((label, value))
+        else:
+            children: list = []
+            stack[depth].append((label.rstrip(":"), children))
+            stack.append(children)
+    return root
+
+
+async def _f2b_status(args: list[str]) -> Optional[list]:
+    """Run a status command and return the structured server response.
+
+    Over the socket this is the response itself; fail2ban-client output is
+    parsed back into the same shape. Returns None if the command failed.
+    """
+    if F2B_SOCKET:
+        response, code = await _f2b_call(args)
+        return response if code == 0 else None
+    output, code = await run_f2b_command(args)
+    return _parse_status_tree(output) if code == 0 else None
 
-    result = {
+
+# Jail status label -> (result key, converter for fail2ban-client's text value)
+_JAIL_STATUS_FIELDS = {
+    "Currently failed": ("currently_failed", int),
+    "Total failed": ("total_failed", int),
+    "Currently banned": ("currently_banned", int),
+    "Total banned": ("total_banned", int),
+    "Banned IP list": ("banned_ips", str.split),
+}
+
+
+def _empty_jail_status(jail_name: str) -> dict:
+    return {
         "name": jail_name,
         "currently_failed": 0,
         "total_failed": 0,
@@ -170,55 +591,406 @@ def parse_jail_status(jail_name: str) -> dict:
         "banned_ips": [],
     }
 
-    for line in output.split("\n"):
-        line = line.strip()
-        if "Currently failed:" in line:
-            result["currently_failed"] = int(re.search(r"\d+", line.split(":")[-1]).group())
-        elif "Total failed:" in line:
-            result["total_failed"] = int(re.search(r"\d+", line.split(":")[-1]).group())
-        elif "Currently banned:" in line:
-            result["currently_banned"] = int(re.search(r"\d+", line.split(":")[-1]).group())
-        elif "Total banned:" in line:
-            result["total_banned"] = int(re.search(r"\d+", line.split(":")[-1]).group())
-        elif "Banned IP list:" in line:
-            ip_str = line.split(":")[-1].strip()
-            if ip_str:
-                result["banned_ips"] = [ip.strip() for ip in ip_str.split() if ip.strip()]
 
+def _jail_status_from_response(jail_name: str, response: list) -> dict:
+    """Flatten the server's [("Filter", [...]), ("Actions", [...])] jail status."""
+    result = _empty_jail_status(jail_name)
+    for _, section in response:
+        for label, value in section:
+            field = _JAIL_STATUS_FIELDS.get(label)
+            if field is not None:
+                key, conv = field
+                result[key] = conv(value) if isinstance(value, str) else value
+    result["banned_ips"] = [str(ip) for ip in result["banned_ips"]]
+    return result
+
+
+def _parse_jail_status_output(jail_name: str, output: str) -> dict:
+    """Parse `fail2ban-client status <jail>` output in a single pass.
+
+    A jail's status is a fixed, two-level tree, so instead of rebuilding it
+    with _parse_status_tree() each "label:\tvalue" line is looked up in
+    _JAIL_STATUS_FIELDS directly.
+    """
+    result = _empty_jail_status(jail_name)
+    fields = _JAIL_STATUS_FIELDS
+    for line in output.splitlines():
+        label, sep, value = line.partition(":\t")
+        if sep:
+            field = fields.get(label.lstrip(" |`-"))
+            if field is not None:
+                key, conv = field
+                result[key] = conv(value)
     return result
 
 
-def get_all_jails() -> list[str]:
+async def parse_jail_status(jail_name: str) -> dict:
+    """Get the status of a single jail."""
+    error = {"error": f"Failed to get status for {jail_name}"}
+    if F2B_SOCKET:
+        response, code = await _f2b_call(["status", jail_name])
+        return _jail_status_from_response(jail_name, response) if code == 0 else error
+    output, code = await run_f2b_command(["status", jail_name])
+    return _parse_jail_status_output(jail_name, output) if code == 0 else error
+
+
+async def get_all_jails() -> list[str]:
     """Get list of all jail names."""
-    output, code = run_f2b_command(["status"])
-    if code != 0:
+    response = await _f2b_status(["status"])
+    if response is None:
         return []
+    jails_str = dict(response).get("Jail list", "")
+    return [j.strip() for j in jails_str.split(",") if j.strip()]
+
+
+async def get_all_jail_statuses() -> dict[str, dict]:
+    """Get the status of every jail with a single `status --all` query.
+
+    Requires fail2ban 1.1 or newer (see _status_all).
+    """
+    response = await _f2b_status(["status", "--all"])
+    if response is None:
+        return {}
+    if isinstance(response[-1], dict):
+        jails = response[-1]
+    else:
+        nodes = dict(response).get("Status for the jails", [])
+        jails = {label[len("Jail: "):]: status for label, status in nodes}
+    return {name: _jail_status_from_response(name, status) for name, status in jails.items()}
+
+
+async def _f2b_get(name: str) -> Optional[str]:
+    """Read a server setting with `get <name>`, or None if the query failed."""
+    if F2B_SOCKET:
+        response, code = await _f2b_call(["get", name])
+        return str(response) if code == 0 else None
+    output, code = await run_f2b_command(["get", name])
+    if code != 0 or not output:
+        return None
+    # fail2ban-client prints "Current logging target is:\n`- <target>" or
+    # "Current logging level is '<level>'"
+    value = output.splitlines()[-1]
+    return value[3:] if value.startswith("`- ") else value.rpartition(" ")[2].strip("'")
+
+
+# fail2ban log levels by name; Ban/Unban lines are logged at NOTICE (25)
+_F2B_LOG_LEVELS = {
+    "CRITICAL": 50, "ERROR": 40, "WARNING": 30, "WARN": 30, "NOTICE": 25, "INFO": 20,
+    "MSG": 18, "DEBUG": 10, "TRACEDEBUG": 7, "HEAVYDEBUG": 5,
+}
+
+
+async def _f2b_logs_bans_to(path: str) -> bool:
+    """Check that the server writes its Ban/Unban (NOTICE) lines to path."""
+    target = await _f2b_get("logtarget")
+    level = await _f2b_get("loglevel")
+    if target is None or level is None:
+        return False
+    level = int(level) if level.isdigit() else _F2B_LOG_LEVELS.get(level.upper(), 100)
+    # SYSLOG, STDOUT and friends never resolve to the log file
+    return level <= 25 and os.path.realpath(target) == os.path.realpath(path)
+
+
+async def get_f2b_version() -> tuple[int, ...]:
+    """Get the (major, minor) fail2ban version, or () if unknown."""
+    if F2B_SOCKET:
+        version, code = await _f2b_call(["version"])
+    else:
+        version, code = await run_f2b_command(["-V"])
+    if code != 0:
+        return ()
+    return tuple(int(n) for n in re.findall(r"\d+", str(version))[:2])
+
+
+# Live status results are cached briefly: dashboards poll from many tabs at
+# once, and callers within STATUS_TTL seconds share a single round of
+# fail2ban queries. Entries are keyed by jail name ("" for the overview).
+STATUS_TTL = 2.0
+_status_cache: dict[str, dict] = {}
+
+
+async def _cached_status(key: str, compute) -> dict:
+    """Return the cached result for key, recomputing it once when stale."""
+    entry = _status_cache.get(key)
+    if entry is None:
+        entry = _status_cache[key] = {"t": 0.0, "data": None, "lock": asyncio.Lock()}
+    if entry["data"] is not None and time.monotonic() - entry["t"] < STATUS_TTL:
+        return entry["data"]
+    async with entry["lock"]:
+        # Another caller may have refreshed the entry while we waited.
+        if entry["data"] is None or time.monotonic() - entry["t"] >= STATUS_TTL:
+            entry["data"] = await compute()
+            entry["t"] = time.monotonic()
+    if "error" in entry["data"]:
+        _status_cache.pop(key, None)
+    return entry["data"]
+
+
+class Hub:
+    """Fan out ban events to every connected WebSocket client.
+
+    Each subscriber gets its own bounded queue; events for a client that
+    falls too far behind are dropped rather than buffered without limit.
+    """
+
+    QUEUE_SIZE = 100
+
+    def __init__(self):
+        self.subs: set[asyncio.Queue] = set()
+
+    def subscribe(self) -> asyncio.Queue:
+        q = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        self.subs.add(q)
+        return q
+
+    def unsubscribe(self, q: asyncio.Queue):
+        self.subs.discard(q)
+
+    def broadcast(self, event: dict):
+        for q in list(self.subs):
+            try:
+                q.put_nowait(event)
+            except asyncio.QueueFull:
+                pass
+
+
+hub = Hub()
+
+
+def _record_action(jail_name: str, ip: str, action: str):
+    """Log a ban/unban, drop stale status and notify WebSocket clients."""
+    timestamp = int(time.time() * 1000)
+    _status_cache.clear()
+    _write_q.put_nowait((timestamp, jail_name, ip, action))
+    hub.broadcast({
+        "action": action, "jail": jail_name, "ip": ip, "timestamp": _ts_to_datetime(timestamp),
+    })
+
+
+_LOG_BAN_RE = tail_re.compile(r"\[(?P<jail>[^\]]+)\] (?P<action>Ban|Unban) (?P<ip>\S+)")
+
+
+class LogTail:
+    """Follow the fail2ban log and record its Ban/Unban lines as they appear.
+
+    Bans and unbans made through the API are recorded by the endpoints
+    themselves, which announce them with expect() so the line fail2ban logs
+    for them is not recorded a second time.
+
+    The log is watched with inotify through pyinotify, as the fail2ban
+    server's own pyinotify backend does: the file for writes, its directory
+    only for the file being recreated, so nothing runs while the log is
+    idle. Without pyinotify the file is polled instead. Rotation is detected
+    by a changed inode, truncation by a shrinking size or, as fail2ban's
+    FileContainer does, by a changed first line (copytruncate followed by
+    writes past the old offset).
+    """
+
+    POLL_INTERVAL = 1.0
+    # How long an expected echo of a manual action is waited for
+    ECHO_TTL = 30.0
 
-    for line in output.split("\n"):
-        if "Jail list:" in line:
-            jails_str = line.split(":")[-1].strip()
-            return [j.strip() for j in jails_str.split(",") if j.strip()]
-    return []
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self._fh = None
+        self._ino = None
+        self._head = b""
+        self._buf = b""
+        self._wm = None
+        self._wd = None
+        self._notifier = None
+        self._task: Optional[asyncio.Task] = None
+        # (jail, ip, action) -> time.monotonic() deadline
+        self._expected: dict[tuple[str, str, str], float] = {}
+
+    def expect(self, key: tuple[str, str, str]):
+        """Skip the next log line for (jail, ip, action); it is recorded already."""
+        now = time.monotonic()
+        for stale in [k for k, deadline in self._expected.items() if deadline < now]:
+            del self._expected[stale]
+        self._expected[key] = now + self.ECHO_TTL
+
+    def forget(self, key: tuple[str, str, str]):
+        self._expected.pop(key, None)
+
+    def start(self):
+        self._open(seek_end=True)
+        if pyinotify is not None:
+            self._wm = pyinotify.WatchManager()
+            self._wm.add_watch(
+                os.path.dirname(self.path), pyinotify.IN_CREATE | pyinotify.IN_MOVED_TO
+            )
+            self._watch_file()
+            self._notifier = pyinotify.Notifier(self._wm, default_proc_fun=self._on_event)
+            asyncio.get_running_loop().add_reader(self._wm.get_fd(), self._on_inotify)
+        else:
+            self._task = asyncio.create_task(self._poll())
+
+    def stop(self):
+        if self._notifier is not None:
+            asyncio.get_running_loop().remove_reader(self._wm.get_fd())
+            self._notifier.stop()
+        if self._task is not None:
+            self._task.cancel()
+        self._fh.close()
+
+    def _open(self, seek_end: bool = False):
+        if self._fh is not None:
+            self._fh.close()
+        self._fh = open(self.path, "rb")
+        self._ino = os.fstat(self._fh.fileno()).st_ino
+        self._head = self._first_line()
+        self._buf = b""
+        if seek_end:
+            self._fh.seek(0, os.SEEK_END)
+        if self._wm is not None:
+            self._watch_file()
+
+    def _watch_file(self):
+        """(Re)watch the file now at self.path, dropping the rotated one's watch."""
+        if self._wd is not None:
+            self._wm.rm_watch(self._wd, quiet=True)
+        self._wd = self._wm.add_watch(self.path, pyinotify.IN_MODIFY).get(self.path)
+
+    def _first_line(self) -> bytes:
+        """The file's first line, or b"" until it is complete."""
+        head = os.pread(self._fh.fileno(), 4096, 0)
+        end = head.find(b"\n")
+        return head[:end + 1] if end >= 0 else b""
+
+    def _on_inotify(self):
+        self._notifier.read_events()
+        self._notifier.process_events()
+
+    def _on_event(self, event):
+        if event.pathname == self.path:
+            self.read()
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(self.POLL_INTERVAL)
+            self.read()
+
+    def read(self):
+        """Consume whatever was appended since the last call."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return  # rotated away and not recreated yet
+        if st.st_ino != self._ino:
+            self._consume(self._fh.read())
+            self._open()
+        else:
+            head = self._first_line()
+            if st.st_size < self._fh.tell() or (self._head and head != self._head):
+                self._fh.seek(0)
+                self._buf = b""
+            self._head = head
+        self._consume(self._fh.read())
+
+    def _consume(self, data: bytes):
+        if not data:
+            return
+        lines = (self._buf + data).split(b"\n")
+        self._buf = lines.pop()
+        for line in lines:
+            # Most log lines are not bans; skip them before decoding or matching
+            if b"] Ban " not in line and b"] Unban " not in line:
+                continue
+            m = _LOG_BAN_RE.search(line.decode(errors="replace"))
+            if m:
+                key = (m.group("jail"), m.group("ip"), m.group("action").lower())
+                if self._expected.pop(key, 0.0) < time.monotonic():
+                    _record_action(*key)
+
+
+_log_tail: Optional[LogTail] = None
+
+
+# Periodically truncate the WAL file so it cannot keep growing when the
+# automatic checkpoints never get a quiet moment to run.
+WAL_CHECKPOINT_INTERVAL = 300
+_wal_task: Optional[asyncio.Task] = None
+
+
+def _checkpoint_wal():
+    with _db_lock:
+        _conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+async def _wal_maintainer():
+    while True:
+        await asyncio.sleep(WAL_CHECKPOINT_INTERVAL)
+        try:
+            await _run_blocking(_checkpoint_wal)
+        except sqlite3.Error as e:
+            print(f"WAL checkpoint failed: {e}")
 
 
 # Determine mode at startup
 _demo_mode = False
+# fail2ban 1.1+ reports every jail in one `status --all`; older versions are
+# queried jail by jail.
+_status_all = False
 
 
 @app.on_event("startup")
 async def startup():
-    global _demo_mode
+    global _demo_mode, _status_all, _write_q, _writer_task, _wal_task, _log_tail, _f2b_shell
     init_db()
+    _write_q = asyncio.Queue()
+    _writer_task = asyncio.create_task(_writer_loop())
+    _wal_task = asyncio.create_task(_wal_maintainer())
+    if F2B_SSH_HOST and not F2B_SOCKET and DEMO_MODE != "true":
+        control_dir = _ssh_control_dir()
+        if control_dir is not None:
+            _ssh_mux_opts[:] = [
+                "-o", "ControlMaster=auto",
+                "-o", "ControlPersist=60s",
+                "-o", f"ControlPath={control_dir}/%C",
+            ]
+            # Open the master connection up front for later commands to reuse
+            await _exec(_ssh_command() + ["true"])
     if DEMO_MODE == "true":
         _demo_mode = True
     elif DEMO_MODE == "false":
         _demo_mode = False
     else:  # auto
-        _demo_mode = not is_f2b_available()
+        _demo_mode = not await is_f2b_available()
     if _demo_mode:
         print("Running in DEMO mode (fail2ban-client not available)")
     else:
+        _status_all = await get_f2b_version() >= (1, 1)
+        if not F2B_SOCKET:
+            shell = InteractiveClientPool(_f2b_client_command())
+            if await shell.start():
+                _f2b_shell = shell
         print("Connected to fail2ban")
+        if F2B_LOG_PATH and not F2B_SSH_HOST:
+            if not await _f2b_logs_bans_to(F2B_LOG_PATH):
+                print(f"Not following {F2B_LOG_PATH}: fail2ban does not log bans there")
+            else:
+                try:
+                    tail = LogTail(F2B_LOG_PATH)
+                    tail.start()
+                    _log_tail = tail
+                    print(f"Following {F2B_LOG_PATH} for ban events")
+                except OSError as e:
+                    print(f"Not following {F2B_LOG_PATH}: {e}")
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    if _log_tail is not None:
+        _log_tail.stop()
+    if _f2b_shell is not None:
+        await _f2b_shell.close()
+    # Flush pending ban log rows before closing the database.
+    await _write_q.join()
+    _writer_task.cancel()
+    _wal_task.cancel()
+    _io_pool.shutdown()
+    _conn.close()
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -227,25 +999,49 @@ async def index():
     return HTMLResponse(content=html_file.read_text(encoding="utf-8"))
 
 
+def _render_json(data) -> dict:
+    """Serialize data once, with a weak ETag derived from the payload."""
+    body = _dumps(data)
+    etag = f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    return {"body": body, "etag": etag}
+
+
 @app.get("/api/status")
-async def get_status():
+async def get_status(request: Request):
     """Get overall fail2ban status with all jails."""
     if _demo_mode:
-        return get_demo_data()
+        rendered = _render_json(get_demo_data())
+    else:
+        # The cache holds the serialized payload, so repeated polls within
+        # STATUS_TTL neither query fail2ban nor re-encode the JSON.
+        rendered = await _cached_status("", _compute_rendered_status)
 
-    jails = get_all_jails()
-    jail_data = {}
-    total_banned = 0
+    # no-cache: browsers must revalidate every time (a cheap 304 while the ETag
+    # matches), so a refresh triggered by a ban event never sees a stale copy
+    headers = {"ETag": rendered["etag"], "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if rendered["etag"] in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(rendered["body"], media_type="application/json", headers=headers)
 
-    for jail in jails:
-        status = parse_jail_status(jail)
-        jail_data[jail] = status
-        total_banned += status.get("currently_banned", 0)
+
+async def _compute_rendered_status() -> dict:
+    return _render_json(await _compute_status())
+
+
+async def _compute_status() -> dict:
+    if _status_all:
+        jail_data = await get_all_jail_statuses()
+    else:
+        jails = await get_all_jails()
+        statuses = await asyncio.gather(*[parse_jail_status(jail) for jail in jails])
+        jail_data = dict(zip(jails, statuses))
+    total_banned = sum(status.get("currently_banned", 0) for status in jail_data.values())
 
     return {
         "jails": jail_data,
         "total_banned_now": total_banned,
-        "total_jails": len(jails),
+        "total_jails": len(jail_data),
         "demo": False,
     }
 
@@ -259,31 +1055,41 @@ async def get_jail(jail_name: str):
             return data["jails"][jail_name]
         raise HTTPException(404, f"Jail '{jail_name}' not found")
 
-    status = parse_jail_status(jail_name)
+    status = await _cached_status(jail_name, lambda: parse_jail_status(jail_name))
     if "error" in status:
         raise HTTPException(500, status["error"])
     return status
 
 
+async def _run_manual_action(jail_name: str, ip: str, action: str) -> tuple[str, int]:
+    """Ban or unban ip through fail2ban and record the action.
+
+    The action is recorded here even while the log is followed, since the
+    tail only sees it if fail2ban still logs NOTICE lines to that file. The
+    echo is announced before the command runs, as the tail may read the log
+    line before the command returns.
+    """
+    key = (jail_name, ip, action)
+    if _log_tail is not None:
+        _log_tail.expect(key)
+    output, code = await run_f2b_command(["set", jail_name, f"{action}ip", ip])
+    if code == 0:
+        _record_action(jail_name, ip, action)
+    elif _log_tail is not None:
+        _log_tail.forget(key)
+    return output, code
+
+
 @app.post("/api/jail/{jail_name}/unban/{ip}")
 async def unban_ip(jail_name: str, ip: str):
     """Unban an IP from a specific jail."""
     if _demo_mode:
         return {"status": "ok", "message": f"[DEMO] Would unban {ip} from {jail_name}"}
 
-    output, code = run_f2b_command(["set", jail_name, "unbanip", ip])
+    output, code = await _run_manual_action(jail_name, ip, "unban")
     if code != 0:
         raise HTTPException(500, f"Failed to unban {ip}: {output}")
 
-    # Log the unban
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute(
-        "INSERT INTO ban_log (timestamp, jail, ip, action) VALUES (?, ?, ?, 'unban')",
-        (datetime.now(timezone.utc).isoformat(), jail_name, ip),
-    )
-    conn.commit()
-    conn.close()
-
     return {"status": "ok", "message": f"Unbanned {ip} from {jail_name}"}
 
 
@@ -293,31 +1099,85 @@ async def ban_ip(jail_name: str, ip: str):
     if _demo_mode:
         return {"status": "ok", "message": f"[DEMO] Would ban {ip} in {jail_name}"}
 
-    output, code = run_f2b_command(["set", jail_name, "banip", ip])
+    output, code = await _run_manual_action(jail_name, ip, "ban")
     if code != 0:
         raise HTTPException(500, f"Failed to ban {ip}: {output}")
 
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute(
-        "INSERT INTO ban_log (timestamp, jail, ip, action) VALUES (?, ?, ?, 'ban')",
-        (datetime.now(timezone.utc).isoformat(), jail_name, ip),
-    )
-    conn.commit()
-    conn.close()
-
     return {"status": "ok", "message": f"Banned {ip} in {jail_name}"}
 
 
+def _fetch_ban_log(limit: int, cursor: Optional[int]) -> dict:
+    # Keyset pagination: seeking below the cursor on the primary key stays
+    # O(log n + limit) however deep the client pages. The predicate is only
+    # added when needed, as "? IS NULL OR id < ?" would defeat the seek.
+    sql = "SELECT id, timestamp, jail, ip, action, country, hostname FROM ban_log"
+    params = []
+    if cursor is not None:
+        sql += " WHERE id < ?"
+        params.append(cursor)
+    sql += " ORDER BY id DESC LIMIT ?"
+    params.append(limit)
+    with _db_lock:
+        cur = _conn.execute(sql, params)
+        rows = cur.fetchall()
+    cols = [d[0] for d in cur.description]
+    items = [dict(zip(cols, row)) for row in rows]
+    for item in items:
+        item["timestamp"] = _ts_to_datetime(item["timestamp"])
+    return {"items": items, "next_cursor": items[-1]["id"] if items else None}
+
+
 @app.get("/api/log")
-async def get_ban_log(limit: int = Query(100, ge=1, le=1000)):
-    """Get recent ban/unban actions."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    rows = conn.execute(
-        "SELECT * FROM ban_log ORDER BY id DESC LIMIT ?", (limit,)
-    ).fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+async def get_ban_log(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[int] = Query(None, description="next_cursor of the previous page"),
+):
+    """Get recent ban/unban actions, newest first."""
+    return await _run_blocking(_fetch_ban_log, limit, cursor)
+
+
+def _fetch_top_ips(limit: int) -> list[dict]:
+    # idx_ban_log_action_ip covers the filter, the grouping and MAX(timestamp)
+    with _db_lock:
+        rows = _conn.execute(
+            "SELECT ip, COUNT(*) AS c, MAX(timestamp) FROM ban_log"
+            " WHERE action = 'ban' GROUP BY ip ORDER BY c DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+    return [
+        {"ip": ip, "ban_count": count, "last_seen": _ts_to_datetime(last)}
+        for ip, count, last in rows
+    ]
+
+
+@app.get("/api/top_ips")
+async def get_top_ips(limit: int = Query(10, ge=1, le=100)):
+    """Get the most frequently banned IPs from the action log."""
+    if _demo_mode:
+        return get_demo_data()["top_ips"][:limit]
+    return await _run_blocking(_fetch_top_ips, limit)
+
+
+@app.websocket("/ws/events")
+async def ws_events(ws: WebSocket):
+    """Push ban/unban events to the client as they happen."""
+    await ws.accept()
+    q = hub.subscribe()
+
+    async def pump():
+        while True:
+            await ws.send_text(_dumps(await q.get()).decode())
+
+    sender = asyncio.create_task(pump())
+    try:
+        # Clients only listen; receiving is how a disconnect is noticed.
+        while True:
+            await ws.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        hub.unsubscribe(q)
 
 
 @app.get("/api/mode")
@@ -0,0 +1,112 @@
+"""Tests for the dashboard's SQLite ban log."""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+import fail2ban_web.app as dashboard
+
+# ban_log as created before timestamps became epoch milliseconds (user_version 0)
+BAN_LOG_V0 = """
+    CREATE TABLE ban_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT NOT NULL,
+        jail TEXT NOT NULL,
+        ip TEXT NOT NULL,
+        action TEXT NOT NULL DEFAULT 'ban',
+        country TEXT,
+        hostname TEXT
+    );
+"""
+
+
+class DatabaseTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._db_path = dashboard.DB_PATH
+        dashboard.DB_PATH = os.path.join(self._tmp.name, "f2b_dashboard.db")
+
+    def tearDown(self):
+        if dashboard._conn is not None:
+            dashboard._conn.close()
+            dashboard._conn = None
+        dashboard.DB_PATH = self._db_path
+        self._tmp.cleanup()
+
+    def test_upgrade_v0_timestamps(self):
+        conn = sqlite3.connect(dashboard.DB_PATH)
+        conn.executescript(BAN_LOG_V0)
+        conn.executemany(
+            "INSERT INTO ban_log (timestamp, jail, ip, action) VALUES (?, ?, ?, ?)",
+            [
+                ("2024-05-01T12:34:56.789000+00:00", "sshd", "1.2.3.4", "ban"),
+                ("2024-05-01T14:34:56.789000+02:00", "sshd", "1.2.3.4", "unban"),
+                ("not a timestamp", "nginx", "2001:db8::1", "ban"),
+            ],
+        )
+        conn.commit()
+        conn.close()
+
+        dashboard.init_db()
+
+        ms = int(datetime(2024, 5, 1, 12, 34, 56, 789000, timezone.utc).timestamp() * 1000)
+        rows = dashboard._conn.execute(
+            "SELECT id, timestamp, jail, ip, action FROM ban_log ORDER BY id"
+        ).fetchall()
+        self.assertEqual(rows, [
+            (1, ms, "sshd", "1.2.3.4", "ban"),
+            (2, ms, "sshd", "1.2.3.4", "unban"),
+            (3, 0, "nginx", "2001:db8::1", "ban"),
+        ])
+        self.assertEqual(
+            dashboard._conn.execute("PRAGMA user_version").fetchone()[0], dashboard.DB_VERSION
+        )
+        self.assertFalse(dashboard._conn.in_transaction)
+        self.assertEqual(
+            dashboard._ts_to_datetime(rows[0][1]),
+            datetime(2024, 5, 1, 12, 34, 56, 789000, timezone.utc),
+        )
+
+    def test_new_database(self):
+        dashboard.init_db()
+        self.assertEqual(
+            dashboard._conn.execute("PRAGMA user_version").fetchone()[0], dashboard.DB_VERSION
+        )
+        self.assertEqual(dashboard._conn.execute("SELECT COUNT(*) FROM ban_log").fetchone()[0], 0)
+
+    def test_ban_log_pages(self):
+        dashboard.init_db()
+        dashboard._insert_ban_log([
+            (1714566896000 + i, "sshd", f"192.0.2.{i}", "ban" if i % 2 else "unban")
+            for i in range(1, 8)
+        ])
+
+        pages = []
+        cursor = None
+        while True:
+            page = dashboard._fetch_ban_log(3, cursor)
+            pages.append([item["id"] for item in page["items"]])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        # Newest first; the page past the last row is empty and ends the walk
+        self.assertEqual(pages, [[7, 6, 5], [4, 3, 2], [1], []])
+
+        item = dashboard._fetch_ban_log(1, None)["items"][0]
+        self.assertEqual(item, {
+            "id": 7,
+            "timestamp": datetime(2024, 5, 1, 12, 34, 56, 7000, timezone.utc),
+            "jail": "sshd",
+            "ip": "192.0.2.7",
+            "action": "ban",
+            "country": None,
+            "hostname": None,
+        })
+        self.assertEqual(dashboard._fetch_ban_log(3, 1), {"items": [], "next_cursor": None})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""Tests for following the fail2ban log."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import fail2ban_web.app as dashboard
+
+
+def ban_line(jail: str, ip: str, action: str = "Ban") -> str:
+    return f"2024-05-01 12:34:56,789 fail2ban.actions [1]: NOTICE  [{jail}] {action} {ip}\n"
+
+
+class LogTailTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "fail2ban.log")
+        with open(self.path, "w") as f:
+            f.write(ban_line("sshd", "192.0.2.1") + ban_line("sshd", "192.0.2.2"))
+        self.recorded = []
+        patcher = mock.patch.object(
+            dashboard, "_record_action", lambda *args: self.recorded.append(args)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Drive read() by hand instead of through inotify or the poll task
+        self.tail = dashboard.LogTail(self.path)
+        self.tail._open(seek_end=True)
+
+    def tearDown(self):
+        self.tail._fh.close()
+        self._tmp.cleanup()
+
+    def append(self, text: str):
+        with open(self.path, "a") as f:
+            f.write(text)
+
+    def test_appended_lines(self):
+        self.append(ban_line("sshd", "2001:db8::1") + "not a ban\n")
+        self.append(ban_line("nginx", "192.0.2.3", "Unban")[:-1])
+        self.tail.read()
+        self.assertEqual(self.recorded, [("sshd", "2001:db8::1", "ban")])
+        self.append("\n")
+        self.tail.read()
+        self.assertEqual(self.recorded[1:], [("nginx", "192.0.2.3", "unban")])
+
+    def test_copytruncate_past_offset(self):
+        offset = os.path.getsize(self.path)
+        with open(self.path, "w") as f:
+            f.write(ban_line("recidive", "192.0.2.10") * 2 + ban_line("recidive", "192.0.2.11"))
+        self.assertGreater(os.path.getsize(self.path), offset)
+        self.tail.read()
+        self.assertEqual(self.recorded, [
+            ("recidive", "192.0.2.10", "ban"),
+            ("recidive", "192.0.2.10", "ban"),
+            ("recidive", "192.0.2.11", "ban"),
+        ])
+
+    def test_rotation(self):
+        self.append(ban_line("sshd", "192.0.2.3"))
+        os.rename(self.path, self.path + ".1")
+        with open(self.path, "w") as f:
+            f.write(ban_line("sshd", "192.0.2.4"))
+        self.tail.read()
+        self.assertEqual(self.recorded, [("sshd", "192.0.2.3", "ban"), ("sshd", "192.0.2.4", "ban")])
+
+    def test_expected_echo(self):
+        self.tail.expect(("sshd", "192.0.2.5", "ban"))
+        self.append(ban_line("sshd", "192.0.2.5") * 2)
+        self.tail.read()
+        # Only the announced line is skipped
+        self.assertEqual(self.recorded, [("sshd", "192.0.2.5", "ban")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""Tests for the pooled `fail2ban-client -i` shells."""
+
+import asyncio
+import sys
+import unittest
+from unittest import mock
+
+import fail2ban_web.app as dashboard
+
+# Stands in for `fail2ban-client -i`: echoes each command after the prompt,
+# taking a while to answer "slow".
+FAKE_SHELL = """
+import sys, time
+while True:
+    try:
+        cmd = input("fail2ban> ")
+    except EOFError:
+        break
+    if cmd == "slow":
+        time.sleep(0.5)
+    print("reply " + cmd)
+"""
+
+
+class InteractiveClientPoolTest(unittest.TestCase):
+
+    def run_pool(self, test):
+        async def main():
+            with mock.patch.object(dashboard.InteractiveClientPool, "SIZE", 1):
+                pool = dashboard.InteractiveClientPool([sys.executable, "-c", FAKE_SHELL])
+            # The fake shell takes the -i the pool appends as a stray argument
+            self.assertTrue(await pool.start())
+            try:
+                await test(pool)
+            finally:
+                await pool.close()
+        asyncio.run(main())
+
+    def test_call(self):
+        async def test(pool):
+            self.assertEqual(await pool.call(["status", "sshd"]), ("reply status sshd", 0))
+        self.run_pool(test)
+
+    def test_cancelled_call_discards_shell(self):
+        async def test(pool):
+            slow = asyncio.create_task(pool.call(["slow"]))
+            await asyncio.sleep(0.2)
+            slow.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await slow
+            # A fresh shell answers; the cancelled command's reply is not reused
+            self.assertEqual(
+                await pool.call(["set", "sshd", "banip", "192.0.2.1"]),
+                ("reply set sshd banip 192.0.2.1", 0),
+            )
+        self.run_pool(test)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+"""Tests for parsing fail2ban-client status output."""
+
+import asyncio
+import unittest
+from unittest import mock
+
+import fail2ban_web.app as dashboard
+
+# fail2ban-client output, as printed by fail2ban 1.1 (values are tab-separated)
+STATUS = "Status\n|- Number of jail:\t2\n`- Jail list:\tnginx, sshd"
+
+STATUS_ALL = """\
+Status
+|- Number of jail:\t2
+|- Jail list:\tnginx, sshd
+`- Status for the jails:
+   |- Jail: nginx
+   |  |- Filter
+   |  |  |- Currently failed:\t0
+   |  |  |- Total failed:\t0
+   |  |  `- Journal matches:\t_SYSTEMD_UNIT=nginx.service + _COMM=nginx
+   |  `- Actions
+   |     |- Currently banned:\t0
+   |     |- Total banned:\t0
+   |     `- Banned IP list:\t
+   `- Jail: sshd
+      |- Filter
+      |  |- Currently failed:\t2
+      |  |- Total failed:\t40
+      |  `- File list:\t/var/log/auth.log /var/log/my - app.log
+      `- Actions
+         |- Currently banned:\t3
+         |- Total banned:\t9
+         `- Banned IP list:\t1.2.3.4 2001:db8::1 fe80::1%eth0"""
+
+JAIL_SSHD = """\
+Status for the jail: sshd
+|- Filter
+|  |- Currently failed:\t2
+|  |- Total failed:\t40
+|  `- File list:\t/var/log/auth.log /var/log/my - app.log
+`- Actions
+   |- Currently banned:\t3
+   |- Total banned:\t9
+   `- Banned IP list:\t1.2.3.4 2001:db8::1 fe80::1%eth0"""
+
+JAIL_NGINX = """\
+Status for the jail: nginx
+|- Filter
+|  |- Currently failed:\t0
+|  |- Total failed:\t0
+|  `- Journal matches:\t_SYSTEMD_UNIT=nginx.service + _COMM=nginx
+`- Actions
+   |- Currently banned:\t0
+   |- Total banned:\t0
+   `- Banned IP list:\t"""
+
+SSHD_STATUS = {
+    "name": "sshd",
+    "currently_failed": 2,
+    "total_failed": 40,
+    "currently_banned": 3,
+    "total_banned": 9,
+    "banned_ips": ["1.2.3.4", "2001:db8::1", "fe80::1%eth0"],
+}
+
+NGINX_STATUS = {
+    "name": "nginx",
+    "currently_failed": 0,
+    "total_failed": 0,
+    "currently_banned": 0,
+    "total_banned": 0,
+    "banned_ips": [],
+}
+
+
+class StatusTreeTest(unittest.TestCase):
+
+    def test_overview(self):
+        self.assertEqual(dashboard._parse_status_tree(STATUS), [
+            ("Number of jail", "2"),
+            ("Jail list", "nginx, sshd"),
+        ])
+
+    def test_status_all(self):
+        tree = dashboard._parse_status_tree(STATUS_ALL)
+        self.assertEqual(tree[:2], [("Number of jail", "2"), ("Jail list", "nginx, sshd")])
+        label, jails = tree[2]
+        self.assertEqual(label, "Status for the jails")
+        self.assertEqual(jails, [
+            ("Jail: nginx", [
+                ("Filter", [
+                    ("Currently failed", "0"),
+                    ("Total failed", "0"),
+                    ("Journal matches", "_SYSTEMD_UNIT=nginx.service + _COMM=nginx"),
+                ]),
+                ("Actions", [
+                    ("Currently banned", "0"),
+                    ("Total banned", "0"),
+                    ("Banned IP list", ""),
+                ]),
+            ]),
+            ("Jail: sshd", [
+                ("Filter", [
+                    ("Currently failed", "2"),
+                    ("Total failed", "40"),
+                    ("File list", "/var/log/auth.log /var/log/my - app.log"),
+                ]),
+                ("Actions", [
+                    ("Currently banned", "3"),
+                    ("Total banned", "9"),
+                    ("Banned IP list", "1.2.3.4 2001:db8::1 fe80::1%eth0"),
+                ]),
+            ]),
+        ])
+
+    def test_status_all_jails(self):
+        async def statuses(output):
+            with mock.patch.object(dashboard, "F2B_SOCKET", ""), \
+                    mock.patch.object(dashboard, "run_f2b_command",
+                                      mock.AsyncMock(return_value=(output, 0))):
+                return await dashboard.get_all_jail_statuses()
+
+        expected = {"nginx": NGINX_STATUS, "sshd": SSHD_STATUS}
+        self.assertEqual(asyncio.run(statuses(STATUS_ALL)), expected)
+        # Command output reaches the parser stripped, dropping the last tab
+        stripped = STATUS_ALL.replace("fe80::1%eth0", "").strip()
+        self.assertEqual(
+            asyncio.run(statuses(stripped))["sshd"]["banned_ips"], ["1.2.3.4", "2001:db8::1"]
+        )
+
+    def test_status_all_socket_response(self):
+        response = [
+            ("Number of jail", 1),
+            ("Jail list", "sshd"),
+            {"sshd": [
+                ("Filter", [("Currently failed", 2), ("Total failed", 40), ("File list", [])]),
+                ("Actions", [("Currently banned", 3), ("Total banned", 9),
+                             ("Banned IP list", ["1.2.3.4", "2001:db8::1", "fe80::1%eth0"])]),
+            ]},
+        ]
+        with mock.patch.object(dashboard, "F2B_SOCKET", "/run/fail2ban/fail2ban.sock"), \
+                mock.patch.object(dashboard, "_f2b_call",
+                                  mock.AsyncMock(return_value=(response, 0))):
+            self.assertEqual(asyncio.run(dashboard.get_all_jail_statuses()), {"sshd": SSHD_STATUS})
+
+    def test_jail_list(self):
+        with mock.patch.object(dashboard, "F2B_SOCKET", ""), \
+                mock.patch.object(dashboard, "run_f2b_command",
+                                  mock.AsyncMock(return_value=(STATUS, 0))):
+            self.assertEqual(asyncio.run(dashboard.get_all_jails()), ["nginx", "sshd"])
+
+
+class JailStatusTest(unittest.TestCase):
+
+    def test_jail(self):
+        self.assertEqual(dashboard._parse_jail_status_output("sshd", JAIL_SSHD), SSHD_STATUS)
+
+    def test_empty_ban_list(self):
+        self.assertEqual(dashboard._parse_jail_status_output("nginx", JAIL_NGINX), NGINX_STATUS)
+        # Command output reaches the parser stripped, dropping the last tab
+        self.assertEqual(
+            dashboard._parse_jail_status_output("nginx", JAIL_NGINX.strip()), NGINX_STATUS
+        )
+
+    def test_matches_tree_parser(self):
+        for name, output in (("sshd", JAIL_SSHD), ("nginx", JAIL_NGINX)):
+            self.assertEqual(
+                dashboard._parse_jail_status_output(name, output),
+                dashboard._jail_status_from_response(name, dashboard._parse_status_tree(output)),
+            )
+
+    def test_failed_command(self):
+        with mock.patch.object(dashboard, "F2B_SOCKET", ""), \
+                mock.patch.object(dashboard, "run_f2b_command",
+                                  mock.AsyncMock(return_value=("ERROR  NOK", 255))):
+            self.assertIn("error", asyncio.run(dashboard.parse_jail_status("nope")))
+
+
+if __name__ == "__main__":
+    unittest.main()